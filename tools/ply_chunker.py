@@ -6,31 +6,50 @@ Analyzes and chunks PLY files for progressive loading in web applications.
 
 import os
 import sys
-import struct
 import json
 import math
+from functools import partial
+from multiprocessing import Pool
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; manifests fall back to the json module
+    orjson = None
+
+# Binary vertex layout: float x,y,z + uchar r,g,b (15 bytes, packed)
+VERTEX_DTYPE = np.dtype([
+    ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+    ('r', 'u1'), ('g', 'u1'), ('b', 'u1'),
+])
+
+# PLY scalar property types and their numpy type codes (byte order applied separately)
+PLY_TYPE_CODES = {
+    'char': 'i1', 'int8': 'i1',
+    'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2',
+    'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4',
+    'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4',
+    'double': 'f8', 'float64': 'f8',
+}
+
+# Block size for scanning the PLY header
+HEADER_READ_SIZE = 64 * 1024
+
 @dataclass
 class PLYHeader:
     """PLY file header information"""
-    format_type: str  # ascii or binary_little_endian
+    format_type: str  # ascii, binary_little_endian or binary_big_endian
     vertex_count: int
-    properties: List[str]
+    properties: List[str]  # property lines of the vertex element
     header_size: int
 
-@dataclass
-class Vertex:
-    """3D vertex with color"""
-    x: float
-    y: float
-    z: float
-    r: int = 255
-    g: int = 255
-    b: int = 255
-    full_data: list = None  # Store full line data for complex PLY files
-
 @dataclass
 class ChunkInfo:
     """Information about a generated chunk"""
@@ -56,30 +75,36 @@ class PLYChunker:
         print(f"Analyzing PLY file: {filepath}")
         
         with open(filepath, 'rb') as f:
-            header_lines = []
-            header_size = 0
-            
-            # Read header line by line
+            # Read in blocks until the end_header line is complete
+            head = b''
             while True:
-                line = f.readline()
-                header_size += len(line)
-                line_str = line.decode('ascii').strip()
-                header_lines.append(line_str)
+                block = f.read(HEADER_READ_SIZE)
+                if not block:
+                    raise ValueError(f"No end_header found in {filepath}")
+                head += block
                 
-                if line_str == 'end_header':
+                end = head.find(b'\nend_header')
+                line_end = head.find(b'\n', end + 1) if end != -1 else -1
+                if line_end != -1:
                     break
             
+            header_size = line_end + 1
+            header_lines = [line.strip() for line in head[:header_size].decode('ascii').splitlines()]
+            
             # Parse header
             format_type = None
             vertex_count = 0
             properties = []
+            current_element = None
             
             for line in header_lines:
                 if line.startswith('format'):
                     format_type = line.split()[1]
-                elif line.startswith('element vertex'):
-                    vertex_count = int(line.split()[2])
-                elif line.startswith('property'):
+                elif line.startswith('element'):
+                    current_element = line.split()[1]
+                    if current_element == 'vertex':
+                        vertex_count = int(line.split()[2])
+                elif line.startswith('property') and current_element == 'vertex':
                     properties.append(line)
             
             return PLYHeader(
@@ -89,182 +114,171 @@ class PLYChunker:
                 header_size=header_size
             )
     
-    def read_vertices_from_ply(self, filepath: str, header: PLYHeader) -> List[Vertex]:
-        """Read all vertices from PLY file."""
+    def _compile_vertex_reader(self, header: PLYHeader) -> np.dtype:
+        """Build a structured dtype describing one vertex record from the header properties."""
+        byte_order = '>' if header.format_type == 'binary_big_endian' else '<'
+        fields = []
+        
+        for line in header.properties:
+            parts = line.split()
+            if parts[1] == 'list':
+                raise ValueError(f"List properties are not supported on vertices: {line}")
+            if parts[1] not in PLY_TYPE_CODES:
+                raise ValueError(f"Unknown PLY property type: {line}")
+            fields.append((parts[2], byte_order + PLY_TYPE_CODES[parts[1]]))
+        
+        vertex_dtype = np.dtype(fields)
+        missing = [axis for axis in ('x', 'y', 'z') if axis not in vertex_dtype.names]
+        if missing:
+            raise ValueError(f"PLY vertices are missing position properties: {', '.join(missing)}")
+        
+        return vertex_dtype
+    
+    def _field_view(self, vertices: np.ndarray, names: Tuple[str, ...], dtype: np.dtype) -> Optional[np.ndarray]:
+        """
+        Zero-copy (N, len(names)) view over adjacent record fields of the given dtype.
+        
+        Returns None if the fields are not laid out back to back with that dtype,
+        in which case the caller has to copy them out instead.
+        """
+        # An empty buffer can't hold a view at a non-zero field offset
+        if len(vertices) == 0:
+            return None
+        
+        fields = vertices.dtype.fields
+        first_offset = fields[names[0]][1]
+        
+        for i, name in enumerate(names):
+            field_dtype, offset = fields[name][:2]
+            if field_dtype != dtype or offset != first_offset + i * dtype.itemsize:
+                return None
+        
+        return np.ndarray(shape=(len(vertices), len(names)), dtype=dtype, buffer=vertices,
+                          offset=first_offset, strides=(vertices.dtype.itemsize, dtype.itemsize))
+    
+    def read_vertices_from_ply(self, filepath: str, header: PLYHeader) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read all vertices from PLY file.
+        
+        Binary files are memory-mapped and, for the usual float xyz + uchar rgb
+        layouts, returned as read-only strided views, so vertex data stays in
+        the OS page cache instead of being copied into process memory.
+        
+        Returns:
+            Tuple of (xyz, rgb) arrays with shapes (N, 3) float32 and (N, 3) uint8
+        """
         print(f"Reading {header.vertex_count} vertices...")
         
-        vertices = []
+        vertex_dtype = self._compile_vertex_reader(header)
+        color_fields = [channel for channel in ('red', 'green', 'blue') if channel in vertex_dtype.names]
         
         with open(filepath, 'rb') as f:
             # Skip header
             f.seek(header.header_size)
             
             if header.format_type == 'ascii':
-                # Read ASCII format
-                for i in range(header.vertex_count):
-                    if i % 10000 == 0:
-                        print(f"  Progress: {i}/{header.vertex_count} ({i/header.vertex_count*100:.1f}%)")
-                    
-                    line = f.readline().decode('ascii').strip()
-                    values = line.split()
-                    
-                    # Store the entire line for reconstruction
-                    vertex = Vertex(
-                        x=float(values[0]),
-                        y=float(values[1]),
-                        z=float(values[2]),
-                        r=int(values[3]) if len(values) > 3 else 255,
-                        g=int(values[4]) if len(values) > 4 else 255,
-                        b=int(values[5]) if len(values) > 5 else 255
-                    )
-                    # Store full line data for later reconstruction
-                    vertex.full_data = values
-                    vertices.append(vertex)
+                # Columns follow the property order in the header
+                columns = [vertex_dtype.names.index(name) for name in ('x', 'y', 'z', *color_fields)]
+                
+                # Parse all vertex rows in one call; max_rows stops before any face data
+                if header.vertex_count:
+                    values = np.loadtxt(f, dtype=np.float64, usecols=columns,
+                                        max_rows=header.vertex_count, ndmin=2)
+                else:
+                    values = np.empty((0, len(columns)), dtype=np.float64)
+                xyz = values[:, :3].astype(np.float32)
+                if len(color_fields) == 3:
+                    rgb = values[:, 3:].astype(np.uint8)
+                else:
+                    rgb = np.full((len(xyz), 3), 255, dtype=np.uint8)
+            
+            elif header.format_type in ('binary_little_endian', 'binary_big_endian'):
+                data_size = header.vertex_count * vertex_dtype.itemsize
+                
+                if header.vertex_count:
+                    # Pages are loaded on demand by each pass over the views below
+                    print(f"  Memory-mapping {data_size/1024/1024:.1f}MB of vertex data")
+                    vertices = np.memmap(filepath, dtype=vertex_dtype, mode='r',
+                                         offset=header.header_size, shape=(header.vertex_count,))
+                else:
+                    vertices = np.empty(0, dtype=vertex_dtype)
+                
+                # Positions and colors as views into the records where the layout allows
+                xyz = self._field_view(vertices, ('x', 'y', 'z'), np.dtype('<f4'))
+                if xyz is None:
+                    xyz = np.empty((len(vertices), 3), dtype=np.float32)
+                    for i, axis in enumerate(('x', 'y', 'z')):
+                        xyz[:, i] = vertices[axis]
+                
+                if len(color_fields) == 3:
+                    rgb = self._field_view(vertices, ('red', 'green', 'blue'), np.dtype('u1'))
+                    if rgb is None:
+                        rgb = np.empty((len(vertices), 3), dtype=np.uint8)
+                        for i, channel in enumerate(color_fields):
+                            rgb[:, i] = vertices[channel]
+                else:
+                    rgb = np.broadcast_to(np.uint8(255), (len(vertices), 3))
             
-            elif header.format_type == 'binary_little_endian':
-                # Read binary format (assuming float x,y,z + uchar r,g,b)
-                for i in range(header.vertex_count):
-                    if i % 10000 == 0:
-                        print(f"  Progress: {i}/{header.vertex_count} ({i/header.vertex_count*100:.1f}%)")
-                    
-                    # Read 3 floats (x, y, z) = 12 bytes
-                    x, y, z = struct.unpack('<fff', f.read(12))
-                    
-                    # Try to read RGB (3 bytes)
-                    try:
-                        r, g, b = struct.unpack('<BBB', f.read(3))
-                    except:
-                        r, g, b = 255, 255, 255
-                    
-                    vertex = Vertex(x=x, y=y, z=z, r=r, g=g, b=b)
-                    vertices.append(vertex)
-        
-        print(f"Successfully read {len(vertices)} vertices")
-        return vertices
+            else:
+                raise ValueError(f"Unsupported PLY format: {header.format_type}")
+        
+        print(f"Successfully read {len(xyz)} vertices")
+        return xyz, rgb
     
-    def calculate_bounding_box(self, vertices: List[Vertex]) -> Dict[str, Dict[str, float]]:
-        """Calculate bounding box for a list of vertices."""
-        if not vertices:
+    def calculate_bounding_box(self, xyz: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Calculate bounding box for an (N, 3) array of vertex positions."""
+        if len(xyz) == 0:
             return {"min": {"x": 0, "y": 0, "z": 0}, "max": {"x": 0, "y": 0, "z": 0}}
         
-        min_x = min_y = min_z = float('inf')
-        max_x = max_y = max_z = float('-inf')
-        
-        for vertex in vertices:
-            min_x = min(min_x, vertex.x)
-            min_y = min(min_y, vertex.y)
-            min_z = min(min_z, vertex.z)
-            max_x = max(max_x, vertex.x)
-            max_y = max(max_y, vertex.y)
-            max_z = max(max_z, vertex.z)
-        
+        mins = xyz.min(axis=0)
+        maxs = xyz.max(axis=0)
         return {
-            "min": {"x": min_x, "y": min_y, "z": min_z},
-            "max": {"x": max_x, "y": max_y, "z": max_z}
+            "min": dict(zip(('x', 'y', 'z'), mins.tolist())),
+            "max": dict(zip(('x', 'y', 'z'), maxs.tolist()))
         }
     
-    def chunk_vertices_radial(self, vertices: List[Vertex]) -> List[List[Vertex]]:
-        """Chunk vertices using enhanced feathered probability-based loading with full distance range."""
-        import math
-        import random
+    def chunk_vertices_radial(self, xyz: np.ndarray, seed: int = 0) -> List[np.ndarray]:
+        """
+        Chunk vertices into equal-count radial shells with feathered edges.
         
-        # Estimate bytes per vertex 
+        Vertices are ranked by distance from origin and split into shells of
+        equal size, nearest first. A random "outer feather" share of vertices is
+        scattered across all chunks so distant vertices appear early and some
+        central ones arrive late. A single sort and a fixed seed keep it
+        O(N log N) and make re-chunking a model reproducible.
+        
+        Returns:
+            List of index arrays into xyz, one per chunk
+        """
         bytes_per_vertex = 20  # Conservative estimate including PLY overhead
         vertices_per_chunk = max(1, self.target_chunk_size_bytes // bytes_per_vertex)
+        vertex_count = len(xyz)
+        chunk_count = max(1, math.ceil(vertex_count / vertices_per_chunk))
         
         print(f"Target chunk size: {self.target_chunk_size_mb}MB")
         print(f"Estimated vertices per chunk: {vertices_per_chunk}")
-        print(f"Using two-way feathered probability-based chunking with outer feathering...")
-        
-        # Calculate distance from origin for each vertex and find max distance
-        vertex_distances = []
-        max_distance = 0
-        
-        for i, vertex in enumerate(vertices):
-            distance = math.sqrt(vertex.x * vertex.x + vertex.y * vertex.y + vertex.z * vertex.z)
-            vertex_distances.append((distance, i, vertex))
-            max_distance = max(max_distance, distance)
-        
-        print(f"Max distance from origin: {max_distance:.2f}")
-        
-        # Sort by distance from origin (closest first) 
-        vertex_distances.sort(key=lambda x: x[0])
-        
-        # Shuffle the vertices to enable true outer feathering
-        # This breaks the distance-sorted order so distant vertices can appear in early chunks
-        random.shuffle(vertex_distances)
-        
-        # Create feathered chunks using enhanced probability-based selection
-        chunks = []
-        remaining_vertices = vertex_distances.copy()
-        chunk_num = 0
-        
-        while remaining_vertices:
-            chunk_num += 1
-            current_chunk = []
-            vertices_to_remove = []
-            
-            # Calculate probability for each remaining vertex
-            for i, (distance, original_index, vertex) in enumerate(remaining_vertices):
-                # Two-way feathering: high probability at center, some probability everywhere
-                # Base probability favors center but gives every vertex a chance
-                center_probability = 0.50 - (distance / max_distance * 0.30)  # 50% -> 20%
-                
-                # Add uniform "outer feather" probability so distant vertices can appear early
-                outer_feather = 0.15  # 15% chance for any vertex regardless of distance
-                
-                # Combine for total base probability
-                base_probability = center_probability + outer_feather  # 65% -> 35%
-                
-                # Increase probability for later chunks to ensure all vertices eventually load
-                chunk_boost = min(0.30, (chunk_num - 1) * 0.08)  # Up to 30% boost for later chunks
-                final_probability = min(1.0, base_probability + chunk_boost)
-                
-                # Special handling for final chunks to clean up remaining vertices
-                if len(remaining_vertices) <= vertices_per_chunk * 1.5:
-                    final_probability = 1.0  # Include everything in final chunks
-                
-                # Random selection based on probability
-                if random.random() < final_probability:
-                    current_chunk.append(vertex)
-                    vertices_to_remove.append(i)
-                    
-                    # Stop when chunk is full
-                    if len(current_chunk) >= vertices_per_chunk:
-                        break
-            
-            # Remove selected vertices from remaining list (in reverse order to maintain indices)
-            for i in reversed(vertices_to_remove):
-                remaining_vertices.pop(i)
-            
-            # Add chunk if it has vertices
-            if current_chunk:
-                chunks.append(current_chunk)
-                
-                # Calculate distance range for this chunk
-                chunk_distances = [math.sqrt(v.x**2 + v.y**2 + v.z**2) for v in current_chunk]
-                min_dist = min(chunk_distances)
-                max_dist = max(chunk_distances)
-                avg_dist = sum(chunk_distances) / len(chunk_distances)
-                
-                print(f"Chunk {chunk_num}: {len(current_chunk)} vertices (distance range: {min_dist:.2f} to {max_dist:.2f}, avg: {avg_dist:.2f})")
-                print(f"  Remaining vertices: {len(remaining_vertices)}")
-            
-            # Safety check to prevent infinite loops
-            if len(vertices_to_remove) == 0 and remaining_vertices:
-                print(f"Warning: No vertices selected in chunk {chunk_num}, forcing inclusion of remaining {len(remaining_vertices)} vertices")
-                # Force remaining vertices into final chunk
-                final_chunk = [vertex for _, _, vertex in remaining_vertices]
-                if final_chunk:
-                    chunks.append(final_chunk)
-                    print(f"Final chunk: {len(final_chunk)} vertices (forced inclusion)")
-                break
-        
-        print(f"Two-way feathered chunking complete: {len(chunks)} chunks created")
+        print(f"Using feathered radial shell chunking ({chunk_count} shells)...")
+        
+        # Squared distance orders vertices the same as distance, so no sqrt for sorting
+        distances_sq = np.einsum('ij,ij->i', xyz, xyz)
+        order = np.argsort(distances_sq, kind='stable')
+        
+        # Load position: distance rank for most vertices, uniformly random for the feather share
+        rng = np.random.default_rng(seed)
+        outer_feather = 0.15
+        load_position = np.empty(vertex_count, dtype=np.float64)
+        load_position[order] = np.arange(vertex_count)
+        feathered = rng.random(vertex_count) < outer_feather
+        load_position[feathered] = rng.random(np.count_nonzero(feathered)) * vertex_count
+        
+        # Equal-count chunks in load order
+        chunks = np.array_split(np.argsort(load_position, kind='stable'), chunk_count)
+        chunks = [chunk for chunk in chunks if len(chunk)]
+        print(f"Feathered radial chunking complete: {len(chunks)} chunks created")
         return chunks
-
-    def chunk_vertices_sequential(self, vertices: List[Vertex]) -> List[List[Vertex]]:
-        """Chunk vertices sequentially based on target chunk size."""
+    
+    def chunk_vertices_sequential(self, xyz: np.ndarray) -> List[np.ndarray]:
+        """Chunk vertices sequentially based on target chunk size, returning index arrays."""
         # Estimate bytes per vertex (assuming float x,y,z + uchar r,g,b = 15 bytes + overhead)
         bytes_per_vertex = 20  # Conservative estimate including PLY overhead
         vertices_per_chunk = max(1, self.target_chunk_size_bytes // bytes_per_vertex)
@@ -273,69 +287,90 @@ class PLYChunker:
         print(f"Estimated vertices per chunk: {vertices_per_chunk}")
         
         chunks = []
-        for i in range(0, len(vertices), vertices_per_chunk):
-            chunk = vertices[i:i + vertices_per_chunk]
+        for i in range(0, len(xyz), vertices_per_chunk):
+            chunk = np.arange(i, min(i + vertices_per_chunk, len(xyz)))
             chunks.append(chunk)
             print(f"Chunk {len(chunks)}: {len(chunk)} vertices")
         
         return chunks
     
-    def write_ply_chunk(self, vertices: List[Vertex], output_path: str, original_header: PLYHeader, overall_bbox: Dict = None) -> int:
-        """Write a chunk of vertices to a PLY file with optional anchor points for consistent bounding box."""
+    def build_anchor_points(self, overall_bbox: Dict) -> np.ndarray:
+        """
+        Build invisible anchor vertices at the corners of the overall bounding box.
         
-        # Add invisible anchor points at overall bounding box corners if provided
-        chunk_vertices = vertices.copy()
+        Every chunk carries the same 8 black points so each one reports a
+        consistent bounding box; they are built once per model and reused.
+        """
+        min_x, min_y, min_z = overall_bbox['min']['x'], overall_bbox['min']['y'], overall_bbox['min']['z']
+        max_x, max_y, max_z = overall_bbox['max']['x'], overall_bbox['max']['y'], overall_bbox['max']['z']
+        
+        return np.array([
+            (min_x, min_y, min_z, 0, 0, 0),  # min corner
+            (max_x, min_y, min_z, 0, 0, 0),  # x max
+            (min_x, max_y, min_z, 0, 0, 0),  # y max
+            (min_x, min_y, max_z, 0, 0, 0),  # z max
+            (max_x, max_y, min_z, 0, 0, 0),  # xy max
+            (max_x, min_y, max_z, 0, 0, 0),  # xz max
+            (min_x, max_y, max_z, 0, 0, 0),  # yz max
+            (max_x, max_y, max_z, 0, 0, 0),  # max corner
+        ], dtype=VERTEX_DTYPE)
+    
+    def write_ply_chunk(self, xyz: np.ndarray, rgb: np.ndarray, output_path: str, original_header: PLYHeader, anchor_points: Optional[np.ndarray] = None) -> Tuple[int, Dict[str, Dict[str, float]]]:
+        """
+        Write a chunk of vertices to a PLY file with optional anchor points for consistent bounding box.
         
-        if overall_bbox:
-            # Add 8 anchor points at the corners of the overall bounding box
-            # These will be black (invisible) and ensure consistent bounding box
-            min_x, min_y, min_z = overall_bbox['min']['x'], overall_bbox['min']['y'], overall_bbox['min']['z']
-            max_x, max_y, max_z = overall_bbox['max']['x'], overall_bbox['max']['y'], overall_bbox['max']['z']
-            
-            anchor_points = [
-                Vertex(min_x, min_y, min_z, 0, 0, 0),  # min corner
-                Vertex(max_x, min_y, min_z, 0, 0, 0),  # x max
-                Vertex(min_x, max_y, min_z, 0, 0, 0),  # y max
-                Vertex(min_x, min_y, max_z, 0, 0, 0),  # z max
-                Vertex(max_x, max_y, min_z, 0, 0, 0),  # xy max
-                Vertex(max_x, min_y, max_z, 0, 0, 0),  # xz max
-                Vertex(min_x, max_y, max_z, 0, 0, 0),  # yz max
-                Vertex(max_x, max_y, max_z, 0, 0, 0),  # max corner
-            ]
-            
-            chunk_vertices.extend(anchor_points)
-            print(f"  Added {len(anchor_points)} anchor points for consistent bounding box")
-        
-        # Always write binary format for better performance and smaller size
-        with open(output_path, 'wb') as f:
-            # Write PLY header as text
-            header_text = "ply\n"
-            header_text += "format binary_little_endian 1.0\n"
-            header_text += f"element vertex {len(chunk_vertices)}\n"
-            
-            # Write only basic properties for compatibility
-            header_text += "property float x\n"
-            header_text += "property float y\n"
-            header_text += "property float z\n"
-            header_text += "property uchar red\n"
-            header_text += "property uchar green\n"
-            header_text += "property uchar blue\n"
-            
-            header_text += "end_header\n"
-            
-            # Write header as bytes
-            f.write(header_text.encode('ascii'))
-            
-            # Write vertex data in binary format
-            for vertex in chunk_vertices:
-                # Pack as little endian: 3 floats (x,y,z) + 3 unsigned chars (r,g,b)
-                vertex_data = struct.pack('<fffBBB', 
-                    vertex.x, vertex.y, vertex.z,
-                    vertex.r, vertex.g, vertex.b)
-                f.write(vertex_data)
-        
-        # Return file size
-        return os.path.getsize(output_path)
+        Args:
+            anchor_points: VERTEX_DTYPE records appended after the chunk (see build_anchor_points)
+        
+        Returns:
+            Tuple of (file size in bytes, bounding box of the chunk vertices excluding anchors)
+        """
+        anchor_count = len(anchor_points) if anchor_points is not None else 0
+        vertex_count = len(xyz) + anchor_count
+        
+        # PLY header as text; only basic properties are written for compatibility
+        header_text = "ply\n"
+        header_text += "format binary_little_endian 1.0\n"
+        header_text += f"element vertex {vertex_count}\n"
+        header_text += "property float x\n"
+        header_text += "property float y\n"
+        header_text += "property float z\n"
+        header_text += "property uchar red\n"
+        header_text += "property uchar green\n"
+        header_text += "property uchar blue\n"
+        header_text += "end_header\n"
+        header_bytes = header_text.encode('ascii')
+        
+        # Serialize header and vertices into one preallocated buffer; the record
+        # view below writes packed little endian vertices straight into it
+        buffer = bytearray(len(header_bytes) + vertex_count * VERTEX_DTYPE.itemsize)
+        buffer[:len(header_bytes)] = header_bytes
+        vertex_data = np.frombuffer(buffer, dtype=VERTEX_DTYPE, count=vertex_count, offset=len(header_bytes))
+        
+        # Chunk vertices first, with the anchors filling the tail
+        chunk_count = len(xyz)
+        for i, (position_field, color_field) in enumerate((('x', 'r'), ('y', 'g'), ('z', 'b'))):
+            vertex_data[position_field][:chunk_count] = xyz[:, i]
+            vertex_data[color_field][:chunk_count] = rgb[:, i]
+        if anchor_count:
+            vertex_data[chunk_count:] = anchor_points
+        
+        # Bounding box of the chunk itself, while its positions are still in cache
+        chunk_bbox = self.calculate_bounding_box(xyz)
+        
+        if anchor_count:
+            print(f"  Added {anchor_count} anchor points for consistent bounding box")
+        
+        # Always write binary format for better performance and smaller size;
+        # unbuffered since the whole file goes out in a single write
+        with open(output_path, 'wb', buffering=0) as f:
+            # Raw writes may be partial, so keep going until the buffer is drained
+            remaining = memoryview(buffer)
+            while remaining:
+                remaining = remaining[f.write(remaining):]
+        
+        # The file is exactly the buffer, so no stat() is needed for its size
+        return len(buffer), chunk_bbox
     
     def chunk_ply_file(self, input_path: str, output_dir: str) -> Dict:
         """
@@ -356,11 +391,11 @@ class PLYChunker:
         print(f"File format: {header.format_type}")
         print(f"Vertex count: {header.vertex_count}")
         
-        # Read all vertices
-        vertices = self.read_vertices_from_ply(input_path, header)
+        # Read all vertices; binary positions may be read-only views of the file
+        xyz, rgb = self.read_vertices_from_ply(input_path, header)
         
         # Calculate overall bounding box before scaling
-        original_bbox = self.calculate_bounding_box(vertices)
+        original_bbox = self.calculate_bounding_box(xyz)
         print(f"Original bounding box: {original_bbox}")
         
         # Calculate auto-scaling factor (same logic as Three.js)
@@ -376,51 +411,63 @@ class PLYChunker:
             scale_factor = 20.0 / max_dimension
             print(f"Model will be scaled by factor: {scale_factor:.4f}")
             print(f"Max dimension: {max_dimension:.2f} -> {max_dimension * scale_factor:.2f}")
-            
-            # Apply scaling to all vertices
-            for vertex in vertices:
-                vertex.x *= scale_factor
-                vertex.y *= scale_factor
-                vertex.z *= scale_factor
-            
-            print(f"Applied scaling to {len(vertices)} vertices")
+            print(f"Scaling is applied to each chunk as it is written")
         else:
             print("No scaling needed (max dimension <= 50)")
         
-        # Calculate scaled bounding box
-        overall_bbox = self.calculate_bounding_box(vertices)
+        # Scaled bounding box: the same float32 multiply applied to the original corners
+        # gives exactly the min/max of the scaled vertices, without another pass
+        corners = np.array([[min_coords[axis] for axis in ('x', 'y', 'z')],
+                            [max_coords[axis] for axis in ('x', 'y', 'z')]], dtype=np.float32)
+        overall_bbox = self.calculate_bounding_box(corners * np.float32(scale_factor))
         print(f"Scaled bounding box: {overall_bbox}")
         
-        # Chunk vertices using radial pattern
-        vertex_chunks = self.chunk_vertices_radial(vertices)
+        # Chunk vertices using radial pattern; uniform scaling doesn't change the
+        # distance order, so chunking runs on the unscaled positions
+        vertex_chunks = self.chunk_vertices_radial(xyz)
+        
+        # Anchor points are identical for every chunk
+        anchor_points = self.build_anchor_points(overall_bbox)
         
         # Write chunks and collect metadata
         chunk_infos = []
+        max_distance = 0.0
         
-        for i, chunk_vertices in enumerate(vertex_chunks):
+        for i, chunk_indices in enumerate(vertex_chunks):
             chunk_filename = f"{base_name}_chunk_{i:03d}.ply"
             chunk_path = os.path.join(model_output_dir, chunk_filename)
             
             print(f"Writing chunk {i+1}/{len(vertex_chunks)}: {chunk_filename}")
-            file_size = self.write_ply_chunk(chunk_vertices, chunk_path, header, overall_bbox)
             
-            chunk_bbox = self.calculate_bounding_box(chunk_vertices)
+            # Gather just this chunk out of the full arrays and scale the copy in place
+            chunk_xyz = xyz[chunk_indices]
+            if scale_factor != 1.0:
+                chunk_xyz *= np.float32(scale_factor)
+            
+            file_size, chunk_bbox = self.write_ply_chunk(chunk_xyz, rgb[chunk_indices], chunk_path, header, anchor_points)
+            
+            # Distance range of the scaled chunk, in the same units as the bounding boxes
+            chunk_distances = np.sqrt(np.einsum('ij,ij->i', chunk_xyz, chunk_xyz))
+            max_distance = max(max_distance, float(chunk_distances.max()))
+            print(f"  Distance range: {chunk_distances.min():.2f} to {chunk_distances.max():.2f}, avg: {chunk_distances.mean():.2f}")
             
             chunk_info = ChunkInfo(
                 filename=chunk_filename,
-                vertex_count=len(chunk_vertices),
+                vertex_count=len(chunk_indices),
                 bounding_box=chunk_bbox,
                 priority=i,  # Sequential priority for now
                 file_size=file_size
             )
             chunk_infos.append(chunk_info)
             
-            print(f"  Vertices: {len(chunk_vertices)}, Size: {file_size/1024/1024:.2f}MB")
+            print(f"  Vertices: {len(chunk_indices)}, Size: {file_size/1024/1024:.2f}MB")
+        
+        print(f"Max distance from origin: {max_distance:.2f}")
         
         # Create manifest
         manifest = {
             "original_file": os.path.basename(input_path),
-            "total_vertices": len(vertices),
+            "total_vertices": len(xyz),
             "chunk_count": len(chunk_infos),
             "overall_bounding_box": overall_bbox,
             "target_chunk_size_mb": self.target_chunk_size_mb,
@@ -438,8 +485,12 @@ class PLYChunker:
         
         # Write manifest file
         manifest_path = os.path.join(model_output_dir, f"{base_name}_manifest.json")
-        with open(manifest_path, 'w') as f:
-            json.dump(manifest, f, indent=2)
+        if orjson is not None:
+            with open(manifest_path, 'wb') as f:
+                f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        else:
+            with open(manifest_path, 'w') as f:
+                json.dump(manifest, f, indent=2)
         
         print(f"\nChunking complete!")
         print(f"Generated {len(chunk_infos)} chunks")
@@ -447,6 +498,21 @@ class PLYChunker:
         
         return manifest
 
+def _process_one(ply_file: str, pointcloud_dir: str, chunks_dir: str, chunk_size_mb: float) -> bool:
+    """Chunk a single pointcloud model; runs in a worker process."""
+    print(f"\n📦 Processing {ply_file}...")
+    input_path = os.path.join(pointcloud_dir, ply_file)
+    
+    # Catch everything so one bad file doesn't take down the pool
+    try:
+        chunker = PLYChunker(target_chunk_size_mb=chunk_size_mb)
+        manifest = chunker.chunk_ply_file(input_path, chunks_dir)
+        print(f"✅ Successfully chunked {ply_file} into {manifest['chunk_count']} chunks")
+        return True
+    except Exception as e:
+        print(f"❌ Error processing {ply_file}: {str(e)}")
+        return False
+
 def auto_chunk_pointcloud_models():
     """Automatically chunk all pointcloud models that don't have chunks yet."""
     # Define paths
@@ -470,8 +536,7 @@ def auto_chunk_pointcloud_models():
     
     print(f"Found {len(ply_files)} PLY files in pointcloud directory")
     
-    chunker = PLYChunker(target_chunk_size_mb=chunk_size_mb)
-    processed_count = 0
+    pending_files = []
     
     for ply_file in ply_files:
         base_name = os.path.splitext(ply_file)[0]
@@ -483,15 +548,16 @@ def auto_chunk_pointcloud_models():
             print(f"✓ Chunks already exist for {ply_file}")
             continue
         
-        print(f"\n📦 Processing {ply_file}...")
-        input_path = os.path.join(pointcloud_dir, ply_file)
-        
-        try:
-            manifest = chunker.chunk_ply_file(input_path, chunks_dir)
-            print(f"✅ Successfully chunked {ply_file} into {manifest['chunk_count']} chunks")
-            processed_count += 1
-        except Exception as e:
-            print(f"❌ Error processing {ply_file}: {str(e)}")
+        pending_files.append(ply_file)
+    
+    processed_count = 0
+    
+    if pending_files:
+        # Each file is independent, so chunk them in parallel
+        worker = partial(_process_one, pointcloud_dir=pointcloud_dir,
+                         chunks_dir=chunks_dir, chunk_size_mb=chunk_size_mb)
+        with Pool(min(os.cpu_count() or 1, len(pending_files))) as pool:
+            processed_count = sum(pool.imap_unordered(worker, pending_files))
     
     print(f"\n🎉 Processing complete!")
     print(f"Processed {processed_count} new models")
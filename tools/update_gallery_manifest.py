@@ -17,6 +17,12 @@ import json
 from datetime import datetime
 import sys
 
+try:
+    import orjson
+except ImportError:
+    # orjson is optional; the json module is used without it
+    orjson = None
+
 def get_gallery_path():
     """Get the path to the gallery directory relative to the tools folder."""
     # From tools/ directory, go up one level and into public/gallery/
@@ -24,17 +30,16 @@ def get_gallery_path():
 
 def get_png_files_in_gallery(gallery_path):
     """Get all PNG files in the gallery directory."""
-    png_files = []
-    
     if not os.path.exists(gallery_path):
         print(f"❌ Gallery directory not found: {gallery_path}")
-        return png_files
-    
-    for filename in os.listdir(gallery_path):
-        if filename.lower().endswith('.png'):
-            png_files.append(filename)
-    
-    return sorted(png_files)
+        return []
+    
+    # scandir exposes the entry type, so only symlinks need a stat()
+    with os.scandir(gallery_path) as entries:
+        return sorted(
+            entry.name for entry in entries
+            if entry.is_file() and entry.name[-4:].lower() == '.png'
+        )
 
 def load_manifest(manifest_path):
     """Load the existing manifest file."""
@@ -55,8 +60,13 @@ def load_manifest(manifest_path):
 def save_manifest(manifest_path, manifest_data):
     """Save the updated manifest file."""
     try:
-        with open(manifest_path, 'w', encoding='utf-8') as f:
-            json.dump(manifest_data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            # orjson always emits UTF-8, matching ensure_ascii=False below
+            with open(manifest_path, 'wb') as f:
+                f.write(orjson.dumps(manifest_data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest_data, f, indent=2, ensure_ascii=False)
         return True
     except Exception as e:
         print(f"❌ Error saving manifest file: {e}")
@@ -118,7 +128,6 @@ def update_manifest():
         print(f"➕ Files to add ({len(files_to_add)}):")
         for filename in sorted(files_to_add):
             print(f"   • {filename}")
-        manifest['files'] = sorted(actual_files)
     else:
         print("✅ No files to add")
     
@@ -126,10 +135,13 @@ def update_manifest():
         print(f"➖ Files to remove ({len(files_to_remove)}):")
         for filename in sorted(files_to_remove):
             print(f"   • {filename}")
-        manifest['files'] = sorted(actual_files)
     else:
         print("✅ No files to remove")
     
+    if files_to_add or files_to_remove:
+        # The scan result is already sorted
+        manifest['files'] = actual_png_files
+    
     # Clean up randomCandidates (only remove missing files, don't add new ones)
     random_candidates_to_remove = current_random_candidates - actual_files
     
@@ -137,14 +149,12 @@ def update_manifest():
         print(f"\n🎲 Cleaning randomCandidates ({len(random_candidates_to_remove)} to remove):")
         for filename in sorted(random_candidates_to_remove):
             print(f"   • {filename}")
-        
-        # Keep only candidates that still exist
-        updated_random_candidates = current_random_candidates & actual_files
-        manifest['randomCandidates'] = sorted(updated_random_candidates)
     else:
         print("\n🎲 randomCandidates are clean (no missing files)")
-        # Ensure randomCandidates are sorted
-        manifest['randomCandidates'] = sorted(current_random_candidates)
+    
+    # Keep only candidates that still exist, sorted once
+    updated_random_candidates = current_random_candidates & actual_files
+    manifest['randomCandidates'] = sorted(updated_random_candidates)
     
     # Update metadata
     manifest['generated'] = datetime.now().isoformat() + 'Z'